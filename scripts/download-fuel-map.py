@@ -6,7 +6,9 @@ Purpose: Demonstrates how to connect to the USGS EROS M2M API using an API token
          bounding box, and download the resulting file.
 
 Requirements:
-  - pip install requests shapely
+  - pip install requests
+  - Optional: pip install orjson (faster GeoJSON and API response parsing)
+  - Optional: pip install ijson (constant-memory parsing of very large GeoJSON files)
   - A valid EROS API token in your environment (EROS_API_TOKEN)
 
 Usage:
@@ -17,16 +19,34 @@ Note:
   - Replace 'NLCD2019_ID' with the correct dataset ID for NLCD in M2M.
   - Replace 'LANDSAT_ARCHIVE' (or 'HDDS', 'DP', etc.) with the correct node for NLCD.
   - If the dataset is distributed as one giant mosaic, you may get only a single scene.
+  - Staging is batched into a single request, and file transfers share a pooled
+    HTTP session across a thread pool (--workers). The threads spend nearly all
+    their time blocked in socket reads with the GIL released, so they overlap
+    just as well as an asyncio client would.
 """
 
 import os
 import sys
+import time
+import uuid
+import json
+import hashlib
+import functools
 import argparse
 import requests
-import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 
-from shapely.geometry import shape, MultiPolygon, Polygon
-from shapely.ops import unary_union
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 # EROS (M2M) base URL
 EROS_M2M_URL = "https://m2m.cr.usgs.gov/api/api/json/stable/"
@@ -35,6 +55,32 @@ EROS_M2M_URL = "https://m2m.cr.usgs.gov/api/api/json/stable/"
 NLCD_DATASET_ID = "NLCD2019_ID"   # <-- Replace with the actual dataset ID for NLCD 2019
 NLCD_NODE = "LANDSAT_ARCHIVE"     # <-- Or 'HDDS' or other node if that's where NLCD is stored
 
+# On-disk cache for idempotent M2M responses; download-request and
+# download-retrieve must never be cached since they stage or track new work
+CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'osborne')
+CACHEABLE_ENDPOINTS = frozenset(("scene-search", "download-options"))
+
+# M2M endpoints that are safe to retry even though they are POSTs; download-request
+# is left out so a transient failure can never stage the same scene twice
+RETRYABLE_ENDPOINTS = frozenset(("scene-search", "download-options", "download-retrieve"))
+
+# GeoJSON files at least this large are stream-parsed with ijson to bound memory;
+# smaller ones are loaded whole, which is faster with orjson
+STREAM_GEOJSON_MIN_BYTES = 128 << 20  # 128 MiB
+
+# Object keys that may lie on the path from the document root to a geometry's coordinates
+GEOJSON_GEOMETRY_PATH = frozenset(("features", "geometry", "geometries", "item"))
+
+# Hash algorithm implied by the length of a hex checksum reported by M2M
+CHECKSUM_ALGORITHMS = {32: "md5", 40: "sha1", 64: "sha256", 128: "sha512"}
+
+# Buffer size for streaming downloads to disk
+DOWNLOAD_BUFFER_SIZE = 1 << 20  # 1 MiB
+
+# Network read size when the response stream has no read1() (urllib3 < 2), kept
+# small so a slow server can't delay the per-scene deadline check for long
+DOWNLOAD_READ_SIZE = 64 << 10  # 64 KiB
+
 def get_api_key():
     """
     Reads the EROS_API_TOKEN environment variable.
@@ -45,168 +91,596 @@ def get_api_key():
         sys.exit(1)
     return token
 
-def api_post(endpoint, payload, api_key):
+def _cache_path(endpoint, payload):
     """
-    Helper function to perform a POST request to the EROS M2M API,
-    with JSON headers and the API key.
+    Returns the cache file for an endpoint/payload pair.
     """
-    url = EROS_M2M_URL + endpoint
-    headers = {
-        'Content-Type': 'application/json',
-        'X-Auth-Token': api_key
-    }
-    response = requests.post(url, data=json.dumps(payload), headers=headers, timeout=60)
-    response.raise_for_status()
-    return response.json()
+    key = hashlib.sha256((endpoint + json.dumps(payload, sort_keys=True)).encode()).hexdigest()
+    return os.path.join(CACHE_DIR, f"{key}.json")
 
-def parse_geojson_bbox(geojson_file):
+def _copy_stream(src, dst, deadline, hasher=None):
+    """
+    Copies src to dst, raising TimeoutError once the monotonic deadline has passed.
+    Feeds each chunk to hasher, if given, so the checksum is computed without a
+    second pass over the file.
+    """
+    # read1() returns whatever has arrived instead of blocking for a full
+    # buffer, so a trickling server can't hold back the deadline check
+    read1 = getattr(src, 'read1', None)
+    while True:
+        chunk = read1(DOWNLOAD_BUFFER_SIZE) if read1 else src.read(DOWNLOAD_READ_SIZE)
+        if not chunk:
+            break
+        if hasher is not None:
+            hasher.update(chunk)
+        dst.write(chunk)
+        if time.monotonic() > deadline:
+            raise TimeoutError("download exceeded its deadline")
+
+class M2MClient:
+    """
+    Client for the EROS M2M API. Holds the API token, the pooled HTTP session
+    shared by API calls and file downloads, and the response cache settings.
+    """
+
+    def __init__(self, token, pool_size=16, cache_ttl=None):
+        """
+        pool_size should cover every download worker so each can hold its own
+        connection. If cache_ttl is given, responses from idempotent endpoints
+        are cached on disk for that many seconds.
+        """
+        self.headers = {
+            'Content-Type': 'application/json',
+            'X-Auth-Token': token
+        }
+        self.cache_ttl = cache_ttl
+        self.session = requests.Session()
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        self.adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", self.adapter)
+
+        # urllib3 never retries POSTs by default, so the idempotent API endpoints
+        # get an adapter whose Retry also allows them (longest mount prefix wins)
+        post_retry = retry.new(allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {"POST"})
+        self.post_adapter = HTTPAdapter(max_retries=post_retry)
+        for endpoint in RETRYABLE_ENDPOINTS:
+            self.session.mount(EROS_M2M_URL + endpoint, self.post_adapter)
+
+    def post(self, endpoint, payload):
+        """
+        Performs a POST request to the EROS M2M API with the JSON and auth headers.
+        If caching is enabled and the endpoint is idempotent, a response cached on
+        disk within the last cache_ttl seconds is returned instead, and fresh
+        successful responses are written back to the cache.
+        """
+        use_cache = self.cache_ttl is not None and endpoint in CACHEABLE_ENDPOINTS
+        if use_cache:
+            cache_file = _cache_path(endpoint, payload)
+            try:
+                if time.time() - os.path.getmtime(cache_file) < self.cache_ttl:
+                    with open(cache_file, 'rb') as f:
+                        return _json.loads(f.read())
+            except (OSError, ValueError):
+                pass
+
+        result = self._post(endpoint, payload)
+
+        # M2M reports most failures in the body, so only cache clean responses
+        if use_cache and result.get('errorCode') is None:
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+                with open(tmp_file, 'w') as f:
+                    json.dump(result, f)
+                os.replace(tmp_file, cache_file)
+            except OSError as e:
+                # An unwritable cache directory shouldn't fail the run
+                print(f"[WARN] Could not write response cache: {e}")
+
+        return result
+
+    def _post(self, endpoint, payload):
+        """
+        Performs the uncached POST for post.
+        """
+        url = EROS_M2M_URL + endpoint
+        # The auth headers are passed per call rather than set on the session so
+        # the token is never sent along with file downloads
+        response = self.session.post(url, data=_json.dumps(payload), headers=self.headers, timeout=(5, 60))
+        if response.status_code >= 400:
+            raise requests.HTTPError(f"{response.status_code} error for url: {url}", response=response)
+        return _json.loads(response.content)
+
+    def scene_search(self, dataset_name, node, spatial_filter, max_results):
+        """
+        Searches a dataset for scenes matching a spatial filter.
+        Reference: https://m2m.cr.usgs.gov/api/docs/#search
+        """
+        return self.post("scene-search", {
+            "datasetName": dataset_name,
+            "node": node,
+            "maxResults": max_results,
+            "sortOrder": "ASC",
+            "startingNumber": 1,
+            "spatialFilter": spatial_filter
+        })
+
+    def download_options(self, dataset_name, node, entity_ids):
+        """
+        Lists the downloadable products for a batch of scenes.
+        """
+        return self.post("download-options", {
+            "datasetName": dataset_name,
+            "node": node,
+            "entityIds": list(entity_ids)
+        })
+
+    def download_request(self, downloads, label):
+        """
+        Stages a batch of downloads, tagged with label so they can be retrieved later.
+        """
+        return self.post("download-request", {"label": label, "downloads": downloads})
+
+    def download_retrieve(self, label):
+        """
+        Lists the downloads staged under label, including ones that have finished preparing.
+        """
+        return self.post("download-retrieve", {"label": label})
+
+    def remote_size(self, url):
+        """
+        Returns the Content-Length of a download link from a HEAD request, or None
+        if the server does not report it.
+        """
+        try:
+            r = self.session.head(url, allow_redirects=True, timeout=(5, 30))
+        except requests.RequestException:
+            return None
+        content_length = r.headers.get('Content-Length')
+        if r.status_code >= 400 or not content_length:
+            return None
+        return int(content_length)
+
+    def download_file(self, url, path, deadline=float('inf'), checksum=None):
+        """
+        Streams url to path via a '.part' file that is renamed into place once
+        complete, resuming a '.part' file left behind by an earlier run.
+        Raises TimeoutError once the monotonic deadline has passed. If a hex
+        checksum is given, the file is verified against it and discarded on mismatch.
+        """
+        part_path = path + ".part"
+        have = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {'Range': f"bytes={have}-"} if have else {}
+        
+        with self.session.get(url, stream=True, headers=headers, timeout=(5, 30)) as r:
+            if r.status_code == 416:
+                # The partial file is no shorter than the whole file, e.g. a
+                # preallocated file left behind by a killed run; start over
+                os.remove(part_path)
+                return self.download_file(url, path, deadline, checksum)
+            r.raise_for_status()
+            
+            offset = have if r.status_code == 206 else 0
+            if offset:
+                print(f"[INFO] Resuming {path} from byte {offset}")
+            with open(part_path, 'r+b' if offset else 'wb', buffering=DOWNLOAD_BUFFER_SIZE) as f:
+                hasher = None
+                if checksum:
+                    algorithm = CHECKSUM_ALGORITHMS.get(len(checksum))
+                    if algorithm is None:
+                        print(f"[WARN] Unrecognized checksum for {path}; not verifying.")
+                    elif offset:
+                        # Hash the bytes kept from the earlier run before appending
+                        hasher = hashlib.file_digest(f, algorithm)
+                    else:
+                        hasher = hashlib.new(algorithm)
+                f.seek(offset)
+                content_length = r.headers.get('Content-Length')
+                if content_length and hasattr(os, 'posix_fallocate'):
+                    # Reserve the whole extent up front to avoid fragmentation
+                    os.posix_fallocate(f.fileno(), offset, int(content_length))
+                if hasattr(os, 'posix_fadvise'):
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                r.raw.decode_content = True
+                try:
+                    _copy_stream(r.raw, f, deadline, hasher)
+                finally:
+                    # Drop the preallocated tail so the partial file's size is the
+                    # resume offset, and so a decoded body that differs from
+                    # Content-Length leaves no zero padding
+                    f.truncate()
+                if hasattr(os, 'posix_fadvise'):
+                    # The file won't be re-read soon; don't let it evict hotter pages.
+                    # Dirty pages can't be dropped, so write them back first
+                    f.flush()
+                    os.fdatasync(f.fileno())
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        
+        if hasher is not None and hasher.hexdigest() != checksum.lower():
+            os.remove(part_path)
+            raise ValueError(f"{algorithm} checksum mismatch for {path}")
+        
+        os.replace(part_path, path)
+        return path
+
+def _position_lists(geom):
+    """
+    Yields each innermost list of positions (a ring, line, or point set) in a
+    GeoJSON geometry, descending into GeometryCollections.
+    """
+    if geom is None:
+        return
+    if geom.get('type') == 'GeometryCollection':
+        for child in geom.get('geometries', []):
+            yield from _position_lists(child)
+        return
+
+    coords = geom.get('coordinates', [])
+    if coords and isinstance(coords[0], (int, float)):
+        # A Point is a single bare position
+        yield [coords]
+        return
+
+    stack = [coords]
+    while stack:
+        coords = stack.pop()
+        if coords and coords[0] and isinstance(coords[0][0], (int, float)):
+            yield coords
+        else:
+            stack.extend(coords)
+
+@functools.lru_cache(maxsize=None)
+def _is_coordinate_prefix(prefix):
+    """
+    Returns True if an ijson prefix (e.g. 'features.item.geometry.coordinates.item.item')
+    points inside a geometry's coordinates rather than e.g. a feature property.
+    """
+    parts = prefix.split('.')
+    if 'coordinates' not in parts:
+        return False
+    idx = parts.index('coordinates')
+    return (all(part in GEOJSON_GEOMETRY_PATH for part in parts[:idx])
+            and all(part == 'item' for part in parts[idx + 1:]))
+
+def _bbox_2d(bbox):
+    """
+    Returns (min_lon, min_lat, max_lon, max_lat) from a GeoJSON 'bbox' member,
+    which holds either 4 (2D) or 6 (3D) numbers.
+    """
+    half = len(bbox) // 2
+    return (float(bbox[0]), float(bbox[1]), float(bbox[half]), float(bbox[half + 1]))
+
+def _bbox_from_stream(f):
+    """
+    Folds every coordinate of an open GeoJSON file into a running bounding box
+    using ijson events, so the document is never held in memory.
+    A top-level 'bbox' member takes precedence over the coordinates, as in
+    _bbox_from_document; if it follows the 'type' field, as written by
+    bboxify_geojson, parsing stops there.
+    """
+    min_lon = min_lat = float('inf')
+    max_lon = max_lat = float('-inf')
+    has_type = False
+    axis = 0
+    bbox = []
+    top_level_bbox = None
+
+    for prefix, event, value in ijson.parse(f, use_float=True):
+        if event == 'start_array':
+            # Each position is its own innermost array: [lon, lat, (alt)]
+            axis = 0
+        elif event == 'number' and _is_coordinate_prefix(prefix):
+            if axis == 0:
+                min_lon = min(min_lon, value)
+                max_lon = max(max_lon, value)
+            elif axis == 1:
+                min_lat = min(min_lat, value)
+                max_lat = max(max_lat, value)
+            axis += 1
+        elif prefix == '' and event == 'map_key' and value == 'type':
+            has_type = True
+        elif prefix == 'bbox.item' and event == 'number':
+            bbox.append(value)
+        elif prefix == 'bbox' and event == 'end_array' and len(bbox) >= 4:
+            top_level_bbox = _bbox_2d(bbox)
+            if has_type:
+                return top_level_bbox
+
+    if not has_type:
+        raise ValueError("Invalid GeoJSON: missing 'type' field.")
+    if top_level_bbox is not None:
+        return top_level_bbox
+    if min_lon > max_lon:
+        raise ValueError("GeoJSON does not contain any geometry coordinates.")
+
+    return (float(min_lon), float(min_lat), float(max_lon), float(max_lat))
+
+def _geometry_bbox(geom):
+    """
+    Returns the bounding box of a single GeoJSON geometry, or None if it has no
+    coordinates. Only the axis-aligned bounds are needed, so take the min/max
+    over the raw positions rather than building geometries. Whole rings are
+    spliced into one flat list so the per-vertex work stays in C builtins.
+    """
+    positions = []
+    for ring in _position_lists(geom):
+        positions.extend(ring)
+
+    if not positions:
+        return None
+    lons = [position[0] for position in positions]
+    lats = [position[1] for position in positions]
+    return (float(min(lons)), float(min(lats)), float(max(lons)), float(max(lats)))
+
+def _union_bbox(bboxes):
     """
-    Parses a GeoJSON file, extracts all Polygon/MultiPolygon features,
-    and returns the bounding box of their union in (min_lon, min_lat, max_lon, max_lat) format.
+    Returns the bounding box enclosing every non-None bbox, or None if there are none.
     """
-    with open(geojson_file, 'r') as f:
-        data = json.load(f)
+    bboxes = [bbox for bbox in bboxes if bbox is not None]
+    if not bboxes:
+        return None
+    return (min(b[0] for b in bboxes), min(b[1] for b in bboxes),
+            max(b[2] for b in bboxes), max(b[3] for b in bboxes))
 
-    # Depending on the GeoJSON structure, we need to collect polygons from:
+def _geojson_features(data):
+    """
+    Returns the features of a parsed GeoJSON document, or None if the document
+    is a bare geometry.
+    """
+    # Depending on the GeoJSON structure, we need to collect geometries from:
     # - FeatureCollection
     # - Single Feature
     # - Or a direct geometry (less common for standard GeoJSON)
     
-    geometries = []
-    
     if 'type' not in data:
         raise ValueError("Invalid GeoJSON: missing 'type' field.")
     
     if data['type'] == 'FeatureCollection':
-        for feature in data['features']:
-            geom = shape(feature['geometry'])
-            geometries.append(geom)
+        return data['features']
     elif data['type'] == 'Feature':
-        geom = shape(data['geometry'])
-        geometries.append(geom)
-    else:
-        # Could be a direct geometry object
-        geom = shape(data)
-        geometries.append(geom)
+        return [data]
+    return None
+
+def _bbox_from_document(data):
+    """
+    Returns the bounding box of every geometry in an already-parsed GeoJSON document,
+    using precomputed 'bbox' members instead of coordinates wherever they are present.
+    """
+    features = _geojson_features(data)
     
-    # Union all polygons
-    if len(geometries) == 1:
-        union_geom = geometries[0]
+    if len(data.get('bbox') or []) >= 4:
+        bbox = _bbox_2d(data['bbox'])
+    elif features is None:
+        bbox = _geometry_bbox(data)
     else:
-        union_geom = unary_union(geometries)
+        bbox = _union_bbox(
+            _bbox_2d(feature['bbox']) if feature.get('bbox') else _geometry_bbox(feature['geometry'])
+            for feature in features
+        )
+
+    if bbox is None:
+        raise ValueError("GeoJSON does not contain any geometry coordinates.")
+
+    return bbox
+
+def parse_geojson_bbox(geojson_file):
+    """
+    Parses a GeoJSON file and returns the bounding box of all its geometries
+    in (min_lon, min_lat, max_lon, max_lat) format.
+    Streams files of at least STREAM_GEOJSON_MIN_BYTES with ijson when it is
+    installed; otherwise loads the file whole.
+    """
+    with open(geojson_file, 'rb') as f:
+        if ijson is not None and os.path.getsize(geojson_file) >= STREAM_GEOJSON_MIN_BYTES:
+            return _bbox_from_stream(f)
+        data = _json.loads(f.read())
 
-    if not union_geom.is_valid:
-        union_geom = union_geom.buffer(0)  # attempt to fix geometry if needed
+    return _bbox_from_document(data)
 
-    # If the result is a polygon (or multi), we can get its bounds
-    if isinstance(union_geom, (Polygon, MultiPolygon)):
-        minx, miny, maxx, maxy = union_geom.bounds
-        return (minx, miny, maxx, maxy)
+def bboxify_geojson(geojson_file):
+    """
+    Computes the bounding box of every feature in a GeoJSON file, writes them back
+    into the file as 'bbox' members (plus a top-level 'bbox' for the whole document),
+    and returns the overall bounding box. Later runs and other tools can then use the
+    precomputed boxes instead of walking every coordinate.
+    """
+    with open(geojson_file, 'rb') as f:
+        data = _json.loads(f.read())
+
+    features = _geojson_features(data)
+    if features is None:
+        bbox = _geometry_bbox(data)
     else:
-        raise ValueError("GeoJSON does not contain valid polygon geometry.")
+        feature_bboxes = []
+        for feature in features:
+            feature_bbox = _geometry_bbox(feature['geometry'])
+            if feature_bbox is None:
+                # Drop any stale box left over from an earlier geometry
+                feature.pop('bbox', None)
+            else:
+                feature['bbox'] = list(feature_bbox)
+                feature_bboxes.append(feature_bbox)
+        bbox = _union_bbox(feature_bboxes)
+
+    if bbox is None:
+        raise ValueError("GeoJSON does not contain any geometry coordinates.")
 
-def search_nlcd(bbox, api_key, max_results=5):
+    # Keep 'bbox' right after 'type' so streaming readers can stop early
+    data.pop('bbox', None)
+    data = {'type': data.pop('type'), 'bbox': list(bbox), **data}
+
+    tmp_file = f"{geojson_file}.{os.getpid()}.tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_file, geojson_file)
+
+    return tuple(bbox)
+
+def search_nlcd(client, bbox, max_results=5):
     """
     Search the M2M API for NLCD items within a bounding box.
     bbox = (min_lon, min_lat, max_lon, max_lat)
     """
     minX, minY, maxX, maxY = bbox
 
-    # The M2M 'search' request. 
-    # Reference: https://m2m.cr.usgs.gov/api/docs/#search
-    search_payload = {
-        "datasetName": NLCD_DATASET_ID,
-        "node": NLCD_NODE,
-        "maxResults": max_results,
-        "sortOrder": "ASC",
-        "startingNumber": 1,
-        "spatialFilter": {
-            "filterType": "mBR",
-            "lowerLeft": {
-                "longitude": minX,
-                "latitude": minY
-            },
-            "upperRight": {
-                "longitude": maxX,
-                "latitude": maxY
-            }
+    spatial_filter = {
+        "filterType": "mBR",
+        "lowerLeft": {
+            "longitude": minX,
+            "latitude": minY
+        },
+        "upperRight": {
+            "longitude": maxX,
+            "latitude": maxY
         }
     }
 
     print(f"\n[INFO] Searching for dataset {NLCD_DATASET_ID} in bbox: {bbox}")
-    search_result = api_post("scene-search", search_payload, api_key)
+    search_result = client.scene_search(NLCD_DATASET_ID, NLCD_NODE, spatial_filter, max_results)
     return search_result
 
-def download_scene(scene_entity_id, api_key, out_dir):
+def _entity_ids_for_label(client, label):
     """
-    Download a scene by:
-      1) Requesting available download options
-      2) Staging the download
-      3) Retrieving the direct link (if immediately available)
-      4) Saving to out_dir
+    Maps downloadId -> entityId for everything staged under label. download-request
+    only echoes download IDs, but download-retrieve reports both.
     """
-    # 1) Check available downloads
-    download_options_payload = {
-        "datasetName": NLCD_DATASET_ID,
-        "node": NLCD_NODE,
-        "entityIds": [scene_entity_id]
+    retrieve_data = client.download_retrieve(label).get('data') or {}
+    return {
+        item['downloadId']: item['entityId']
+        for item in retrieve_data.get('available', []) + retrieve_data.get('requested', [])
+        if item.get('entityId') and 'downloadId' in item
     }
-    download_opts = api_post("download-options", download_options_payload, api_key)
+
+def stage_all(client, scene_ids, label):
+    """
+    Stage downloads for all scenes at once by:
+      1) Requesting download options for every scene in a single call
+      2) Staging every available product in a single download request,
+         tagged with label so it can be retrieved later
+    Returns a tuple of ({entity_id: download item}, {download_id: entity_id})
+    where the first dict holds the M2M entries (with 'url' and, when reported,
+    'checksum') of downloads that are immediately available and the second holds
+    the downloads that are still being prepared. An entity ID that could not be
+    resolved yet is None.
+    """
+    # 1) Check available downloads
+    download_opts = client.download_options(NLCD_DATASET_ID, NLCD_NODE, scene_ids)
     
-    if not download_opts or 'data' not in download_opts:
-        print("[WARN] No download options returned for scene:", scene_entity_id)
-        return None
+    if not download_opts or not download_opts.get('data'):
+        print("[WARN] No download options returned for scenes:", scene_ids)
+        return {}, {}
     
-    # If multiple items are returned, pick the first available
-    product_id = None
+    # If multiple items are returned for a scene, pick the first available
+    product_ids = {}
     for item in download_opts['data']:
-        if item.get('available'):
-            product_id = item['id']  # or 'downloadId'
-            break
+        entity_id = item.get('entityId')
+        if item.get('available') and entity_id not in product_ids:
+            product_ids[entity_id] = item['id']  # or 'downloadId'
     
-    if not product_id:
-        print("[WARN] No available products for scene:", scene_entity_id)
-        return None
+    for scene_entity_id in scene_ids:
+        if scene_entity_id not in product_ids:
+            print("[WARN] No available products for scene:", scene_entity_id)
     
-    # 2) Stage the download
-    download_request_payload = {
-        "downloads": [
-            {
-                "datasetName": NLCD_DATASET_ID,
-                "entityId": scene_entity_id,
-                "productId": product_id,
-                "node": NLCD_NODE
-            }
-        ]
-    }
-    download_request_resp = api_post("download-request", download_request_payload, api_key)
+    if not product_ids:
+        return {}, {}
+    
+    # 2) Stage the downloads
+    downloads = [
+        {
+            "datasetName": NLCD_DATASET_ID,
+            "entityId": scene_entity_id,
+            "productId": product_id,
+            "node": NLCD_NODE
+        }
+        for scene_entity_id, product_id in product_ids.items()
+    ]
+    download_request_resp = client.download_request(downloads, label)
     if not download_request_resp.get('data'):
-        print("[ERROR] Could not stage download for scene:", scene_entity_id)
-        return None
+        print("[ERROR] Could not stage downloads for scenes:", list(product_ids))
+        return {}, {}
     
     available_downloads = download_request_resp['data'].get('availableDownloads', [])
     preparing_downloads = download_request_resp['data'].get('preparingDownloads', [])
     
-    # If it's immediately available
-    if available_downloads:
-        download_url = available_downloads[0]['url']
-    else:
-        print("[INFO] Download is being prepared; no immediate link available.")
-        if preparing_downloads:
-            print("[INFO] Scenes in 'preparing' status:", preparing_downloads)
-        return None
+    if preparing_downloads:
+        print("[INFO] Some downloads are being prepared; no immediate link available.")
+        print("[INFO] Scenes in 'preparing' status:", preparing_downloads)
+    
+    # Files are named after the scene, so map each download back to its entity ID
+    staged = available_downloads + preparing_downloads
+    entity_ids = {item['downloadId']: item['entityId'] for item in staged if item.get('entityId')}
+    if any(item['downloadId'] not in entity_ids for item in staged):
+        entity_ids.update(_entity_ids_for_label(client, label))
+    
+    downloads = {}
+    for item in available_downloads:
+        entity_id = entity_ids.get(item['downloadId'])
+        if entity_id is None:
+            print("[WARN] Could not match download to a scene:", item['downloadId'])
+            continue
+        downloads[entity_id] = item
+    pending = {item['downloadId']: entity_ids.get(item['downloadId']) for item in preparing_downloads}
+    return downloads, pending
+
+def retrieve_prepared(client, label, pending, max_wait, max_delay=60):
+    """
+    Polls download-retrieve for downloads staged under label until every download
+    in pending ({download_id: entity_id}) is available or max_wait seconds have
+    elapsed, backing off exponentially between polls. Yields (entity_id, download
+    item) as each becomes available so the caller can start downloading without
+    waiting for the rest.
+    """
+    pending = dict(pending)
+    delay = 5
+    deadline = time.monotonic() + max_wait
     
-    # 3) Download the file
-    os.makedirs(out_dir, exist_ok=True)
+    while pending:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            print("[WARN] Gave up waiting for downloads to be prepared:",
+                  [entity_id or download_id for download_id, entity_id in pending.items()])
+            return
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_delay)
+        
+        try:
+            retrieve_resp = client.download_retrieve(label)
+        except (requests.RequestException, ValueError) as e:
+            # A failed poll shouldn't lose the pending scenes; try again later
+            print(f"[WARN] Could not poll prepared downloads: {e}")
+            continue
+        for item in (retrieve_resp.get('data') or {}).get('available', []):
+            # Match on downloadId, the only field every M2M response carries
+            download_id = item.get('downloadId')
+            if download_id in pending and item.get('url'):
+                entity_id = pending.pop(download_id) or item.get('entityId')
+                if entity_id is None:
+                    print("[WARN] Could not match download to a scene:", download_id)
+                    continue
+                yield entity_id, item
+
+def download_scene(client, scene_entity_id, download_url, out_dir, timeout, deadline=float('inf'), checksum=None):
+    """
+    Saves a staged scene from its direct download link into out_dir.
+    Skips scenes that are already present, and resumes a partial download left
+    in a '.part' file by an earlier run.
+    Gives up after timeout seconds, or at the monotonic deadline if that is sooner.
+    If a hex checksum is given, the download is verified against it and discarded
+    on mismatch.
+    """
+    deadline = min(deadline, time.monotonic() + timeout)
     local_filename = os.path.join(out_dir, f"{scene_entity_id}.tif")
     
-    print(f"[INFO] Downloading scene to: {local_filename}")
-    with requests.get(download_url, stream=True) as r:
-        r.raise_for_status()
-        with open(local_filename, 'wb') as f:
-            for chunk in r.iter_content(chunk_size=8192):
-                f.write(chunk)
+    # Scenes are only renamed into place once complete, but a file of the
+    # wrong size (e.g. copied in by hand) is re-downloaded
+    if os.path.exists(local_filename):
+        expected_size = client.remote_size(download_url)
+        if expected_size is None or os.path.getsize(local_filename) == expected_size:
+            print("[INFO] Scene already downloaded:", local_filename)
+            return local_filename
     
+    print(f"[INFO] Downloading scene to: {local_filename}")
+    client.download_file(download_url, local_filename, deadline, checksum)
     print("[INFO] Download complete:", local_filename)
     return local_filename
 
@@ -216,17 +690,37 @@ def main():
                         help="Path to a GeoJSON file containing polygon(s).")
     parser.add_argument("--out_dir", type=str, default="downloads",
                         help="Output directory for downloaded data.")
+    parser.add_argument("--workers", type=int, default=8,
+                        help="Maximum number of scenes to download concurrently.")
+    parser.add_argument("--prepare-timeout", type=float, default=1800,
+                        help="Maximum seconds to wait for scenes that are still being prepared.")
+    parser.add_argument("--scene-timeout", type=float, default=600,
+                        help="Maximum seconds to spend downloading a single scene.")
+    parser.add_argument("--total-timeout", type=float, default=None,
+                        help="Maximum seconds for the whole run; outstanding downloads are abandoned.")
+    parser.add_argument("--bboxify", action="store_true",
+                        help="Write per-feature and overall 'bbox' members back into the GeoJSON file.")
+    parser.add_argument("--cache", action=argparse.BooleanOptionalAction, default=True,
+                        help=f"Cache search and download-option responses under {CACHE_DIR}.")
+    parser.add_argument("--cache-ttl", type=float, default=24 * 60 * 60,
+                        help="Seconds a cached response stays valid.")
     args = parser.parse_args()
     
+    cache_ttl = args.cache_ttl if args.cache else None
+    deadline = time.monotonic() + args.total_timeout if args.total_timeout else float('inf')
+    
     # 1) Get API key from environment
-    api_key = get_api_key()
+    client = M2MClient(get_api_key(), pool_size=max(16, args.workers), cache_ttl=cache_ttl)
     
     # 2) Parse bounding box from GeoJSON
-    bbox = parse_geojson_bbox(args.geojson)
+    if args.bboxify:
+        bbox = bboxify_geojson(args.geojson)
+    else:
+        bbox = parse_geojson_bbox(args.geojson)
     print(f"[INFO] Parsed bounding box from GeoJSON: {bbox}")
     
     # 3) Search
-    search_result = search_nlcd(bbox=bbox, api_key=api_key, max_results=10)
+    search_result = search_nlcd(client, bbox=bbox, max_results=10)
     if 'data' not in search_result:
         print("[ERROR] Unexpected search response:", search_result)
         sys.exit(1)
@@ -235,16 +729,50 @@ def main():
         print("[INFO] No scenes found in the specified region.")
         sys.exit(0)
     
-    scenes = search_result['data']['results']
+    # Drop duplicate scenes so each is staged and downloaded only once
+    scenes = list({scene['entityId']: scene for scene in search_result['data']['results']}.values())
     print(f"[INFO] Found {len(scenes)} scene(s). Downloading up to {len(scenes)} scene(s).")
     
-    # 4) Download each scene
     for idx, scene in enumerate(scenes):
         scene_id = scene['entityId']
         scene_name = scene.get('displayId', 'UnknownNLCDScene')
         print(f"  {idx+1}. Scene ID: {scene_id}  Name: {scene_name}")
-        
-        download_scene(scene_id, api_key, args.out_dir)
+
+    # 4) Stage every scene with one batched options + request round-trip;
+    #    the label lets us retrieve this session's downloads that need preparing
+    label = f"osborne-{uuid.uuid4()}"
+    downloads, pending = stage_all(client, [scene['entityId'] for scene in scenes], label)
+
+    # 5) Download scenes concurrently; the work is network-bound, so a small
+    #    thread pool overlaps the transfers without hammering the server.
+    #    Scenes that are still being prepared join the pool as they become ready.
+    os.makedirs(args.out_dir, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        def submit(scene_id, item):
+            future = executor.submit(download_scene, client, scene_id, item['url'], args.out_dir,
+                                     args.scene_timeout, deadline, item.get('checksum'))
+            futures[future] = scene_id
+
+        futures = {}
+        for scene_id, item in downloads.items():
+            submit(scene_id, item)
+        prepare_timeout = min(args.prepare_timeout, deadline - time.monotonic())
+        for scene_id, item in retrieve_prepared(client, label, pending, prepare_timeout):
+            submit(scene_id, item)
+
+        try:
+            timeout = max(0, deadline - time.monotonic()) if args.total_timeout else None
+            for future in as_completed(futures, timeout=timeout):
+                scene_id = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"[ERROR] Download failed for scene {scene_id}: {e}")
+        except TimeoutError:
+            # Drop queued downloads; running ones stop at the same deadline
+            unfinished = [scene_id for future, scene_id in futures.items()
+                          if future.cancel() or not future.done()]
+            print("[ERROR] Total timeout reached; abandoning scenes:", unfinished)
 
 if __name__ == "__main__":
     main()